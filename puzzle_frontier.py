@@ -0,0 +1,232 @@
+# External-Memory Breadth-First Search for N x N Sliding Puzzles
+# ====================================================================
+#
+# Layer d of the search is a sorted file of packed states at distance d
+# from the goal.  Layer d + 1 is built by expanding layer d in chunks that
+# fit in memory, writing each chunk as a sorted run file, then merging the
+# runs and dropping states already in layers d and d - 1 (in a sliding
+# puzzle every neighbor of layer d lies in layer d - 1, d or d + 1).
+#
+# A layer file only appears under its final name once it is complete, so
+# an interrupted search resumes from the last finished layer.
+
+import argparse
+import heapq
+import json
+import os
+import shutil
+from typing import Iterator, List, Optional, Sequence
+
+
+class FrontierSearch:
+    """Disk-backed layer-by-layer BFS from the goal of an N x N puzzle.
+
+    With `pattern`, tiles outside the pattern are treated as identical,
+    so the layers hold the distances of a pattern database."""
+
+    def __init__(self, size: int, workdir: str, chunk_size: int = 1000000,
+                 pattern: Optional[Sequence[int]] = None):
+        self.size = size
+        self.cells = size * size
+        self.workdir = workdir
+        self.chunk_size = chunk_size
+
+        goal = list(range(1, self.cells)) + [0]
+        if pattern is not None:
+            excluded = [tile for tile in goal if tile != 0 and tile not in pattern]
+            if excluded:
+                goal = [tile if tile == 0 or tile in pattern else min(excluded) for tile in goal]
+        self.goal = goal
+
+        # Two tiles per byte while every label fits in a nibble
+        self.nibbles = self.cells <= 16
+        self.record_size = (self.cells + 1) // 2 if self.nibbles else self.cells
+
+        self.adjacent = []
+        for pos in range(self.cells):
+            row, col = pos // size, pos % size
+            self.adjacent.append([r * size + c for r, c in
+                                  ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1))
+                                  if 0 <= r < size and 0 <= c < size])
+
+        os.makedirs(workdir, exist_ok=True)
+
+    def pack(self, state: Sequence[int]) -> bytes:
+        if not self.nibbles:
+            return bytes(state)
+        padded = list(state) + [0] * (self.record_size * 2 - self.cells)
+        return bytes((padded[i] << 4) | padded[i + 1] for i in range(0, len(padded), 2))
+
+    def unpack(self, record: bytes) -> List[int]:
+        if not self.nibbles:
+            return list(record)
+        state = []
+        for byte in record:
+            state.append(byte >> 4)
+            state.append(byte & 0x0F)
+        return state[:self.cells]
+
+    def layer_path(self, depth: int) -> str:
+        return os.path.join(self.workdir, f'layer_{depth:04d}.bin')
+
+    def read_layer(self, depth: int) -> Iterator[bytes]:
+        if depth >= 0:
+            yield from self._read_records(self.layer_path(depth))
+
+    def _read_records(self, path: str) -> Iterator[bytes]:
+        block = self.record_size * 65536
+        with open(path, 'rb') as f:
+            while True:
+                data = f.read(block)
+                if not data:
+                    break
+                for i in range(0, len(data), self.record_size):
+                    yield data[i:i + self.record_size]
+
+    def _write_layer(self, depth: int, records: Iterator[bytes]) -> int:
+        path = self.layer_path(depth)
+        count = 0
+        with open(path + '.tmp', 'wb') as f:
+            buffer = []
+            for record in records:
+                buffer.append(record)
+                count += 1
+                if len(buffer) >= 65536:
+                    f.write(b''.join(buffer))
+                    buffer = []
+            f.write(b''.join(buffer))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + '.tmp', path)
+        return count
+
+    def _expand(self, depth: int, run_dir: str) -> List[str]:
+        """Write the neighbors of layer `depth` as sorted, duplicate-free run files"""
+        runs = []
+        chunk = set()
+
+        def flush():
+            path = os.path.join(run_dir, f'run_{len(runs):06d}.bin')
+            with open(path, 'wb') as f:
+                f.write(b''.join(sorted(chunk)))
+            runs.append(path)
+            chunk.clear()
+
+        for record in self.read_layer(depth):
+            state = self.unpack(record)
+            blank_pos = state.index(0)
+            for new_pos in self.adjacent[blank_pos]:
+                state[blank_pos], state[new_pos] = state[new_pos], 0
+                chunk.add(self.pack(state))
+                state[new_pos], state[blank_pos] = state[blank_pos], 0
+            if len(chunk) >= self.chunk_size:
+                flush()
+
+        if chunk:
+            flush()
+        return runs
+
+    @staticmethod
+    def _unique(records: Iterator[bytes]) -> Iterator[bytes]:
+        previous = None
+        for record in records:
+            if record != previous:
+                yield record
+                previous = record
+
+    @staticmethod
+    def _difference(records: Iterator[bytes], *excluded: Iterator[bytes]) -> Iterator[bytes]:
+        """Sorted records that appear in none of the sorted `excluded` streams"""
+        heads = [next(stream, None) for stream in excluded]
+        for record in records:
+            duplicate = False
+            for i, stream in enumerate(excluded):
+                while heads[i] is not None and heads[i] < record:
+                    heads[i] = next(stream, None)
+                if heads[i] == record:
+                    duplicate = True
+            if not duplicate:
+                yield record
+
+    def completed_layers(self) -> int:
+        depth = 0
+        while os.path.exists(self.layer_path(depth)):
+            depth += 1
+        return depth
+
+    def layer_size(self, depth: int) -> int:
+        return os.path.getsize(self.layer_path(depth)) // self.record_size
+
+    def run(self, max_depth: Optional[int] = None, verbose: bool = False) -> List[int]:
+        """Search until the state space is exhausted or `max_depth` layers are done,
+        resuming after the last complete layer.  Returns the number of states per depth."""
+        depth = self.completed_layers()
+        if depth == 0:
+            self._write_stats([])
+            self._write_layer(0, iter([self.pack(self.goal)]))
+            depth = 1
+        else:
+            self._check_resumable()
+
+        counts = [self.layer_size(d) for d in range(depth)]
+        while counts[-1] > 0 and (max_depth is None or depth <= max_depth):
+            run_dir = os.path.join(self.workdir, f'runs_{depth:04d}')
+            shutil.rmtree(run_dir, ignore_errors=True)
+            os.makedirs(run_dir)
+
+            runs = self._expand(depth - 1, run_dir)
+            merged = self._unique(heapq.merge(*[self._read_records(path) for path in runs]))
+            fresh = self._difference(merged, self.read_layer(depth - 1), self.read_layer(depth - 2))
+            counts.append(self._write_layer(depth, fresh))
+            shutil.rmtree(run_dir)
+
+            self._write_stats(counts)
+            if verbose:
+                print(f'depth {depth}: {counts[-1]} states')
+            depth += 1
+
+        return counts
+
+    def _check_resumable(self):
+        """Refuse to build on layers left by a search of another board or pattern"""
+        path = os.path.join(self.workdir, 'stats.json')
+        try:
+            with open(path) as f:
+                stats = json.load(f)
+        except (OSError, ValueError):
+            raise ValueError(f'{self.workdir} has layer files but no readable stats.json')
+
+        if stats.get('size') != self.size or stats.get('goal') != self.goal:
+            raise ValueError(f'{self.workdir} holds a search of size {stats.get("size")} '
+                             f'with goal {stats.get("goal")}; use another work directory')
+
+    def _write_stats(self, counts: List[int]):
+        path = os.path.join(self.workdir, 'stats.json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump({'size': self.size, 'goal': self.goal, 'counts': counts}, f)
+        os.replace(path + '.tmp', path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='External-memory BFS over sliding puzzle states')
+    parser.add_argument('--size', type=int, default=3, help='board width (default: 3)')
+    parser.add_argument('--workdir', required=True, help='directory for layer and run files')
+    parser.add_argument('--chunk-size', type=int, default=1000000,
+                        help='states expanded in memory before a run is written')
+    parser.add_argument('--max-depth', type=int, help='stop after this layer')
+    parser.add_argument('--pattern', help='comma-separated tiles for a pattern database, e.g. 1,2,3,4')
+    args = parser.parse_args(argv)
+
+    pattern = [int(tile) for tile in args.pattern.split(',')] if args.pattern else None
+    search = FrontierSearch(args.size, args.workdir, args.chunk_size, pattern)
+    try:
+        counts = search.run(args.max_depth, verbose=True)
+    except ValueError as e:
+        parser.error(str(e))
+
+    reached = counts[:-1] if counts[-1] == 0 else counts
+    print(f'{sum(reached)} states, maximum depth {len(reached) - 1}')
+
+
+if __name__ == '__main__':
+    main()
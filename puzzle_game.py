@@ -1,18 +1,25 @@
 # 8-Puzzle Game with Image Upload - Minimal Design (Version 6 Style)
 # ====================================================================
 
-from flask import Flask, render_template_string, jsonify, request
+from flask import Flask, Response, render_template_string, jsonify, request
 from flask_cors import CORS
 import random
 import time
-import heapq
-from collections import deque
-from typing import List, Tuple, Dict, Optional
+from collections import OrderedDict
+from typing import List, Dict, Optional
+import hashlib
+import io
+import math
+import threading
 import uuid
 import json
 
+from puzzle_solver import PuzzleState, PuzzleSolver, PortfolioSolver, PuzzleGenerator, SolutionCache
+from puzzle_symmetry import GoalFrame
+
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-here-change-in-production'
+app.config['MAX_CONTENT_LENGTH'] = 10 * 1024 * 1024
 CORS(app)
 
 # Store game sessions
@@ -59,7 +66,7 @@ HTML_TEMPLATE = '''
         }
 
         .puzzle-piece.image {
-            background-size: 300px 300px;
+            background-size: 100px 100px;
             background-repeat: no-repeat;
         }
 
@@ -143,7 +150,21 @@ HTML_TEMPLATE = '''
             <option value="bfs">Breadth-First Search (BFS)</option>
             <option value="dfs">Depth-First Search (DFS - Limited)</option>
             <option value="greedy">Greedy Best-First Search</option>
+            <option value="anytime">Anytime Weighted A* (Bounded)</option>
+            <option value="beam">Beam Search (Width 100)</option>
+            <option value="portfolio">Portfolio (Race Optimal Solvers)</option>
+        </select>
+
+        <label>Difficulty:</label>
+        <select id="difficultySelect">
+            <option value="">Random Shuffle</option>
+            <option value="easy">Easy</option>
+            <option value="medium">Medium</option>
+            <option value="hard">Hard</option>
         </select>
+
+        <label>Goal:</label>
+        <input type="text" id="goalInput" placeholder="1,2,3,4,5,6,7,8,0">
     </div>
 
     <div class="section">
@@ -152,6 +173,7 @@ HTML_TEMPLATE = '''
         <button onclick="solvePuzzle()">Solve</button>
         <button onclick="resetPuzzle()">Reset</button>
         <button onclick="animateSolution()">Animate Solution</button>
+        <button onclick="showHint()">Hint</button>
     </div>
 
     <div class="section">
@@ -173,6 +195,8 @@ HTML_TEMPLATE = '''
 
     <div id="successMessage" style="display: none;"></div>
 
+    <div id="hintMessage" style="display: none;"></div>
+
     <div id="solutionContainer" style="display: none;">
         <h3>Solution</h3>
         <div id="solutionInfo"></div>
@@ -183,36 +207,58 @@ HTML_TEMPLATE = '''
         let sessionId = null;
         let currentSolution = null;
         let isAnimating = false;
-        let uploadedImage = null;
+        let imageId = null;
+        let previewUrl = null;
+        let goalState = [1, 2, 3, 4, 5, 6, 7, 8, 0];
+        let goalDrawn = false;
 
         // Initialize game on page load
         window.onload = function() {
             newGame();
 
             // Handle image upload
-            document.getElementById('imageInput').addEventListener('change', function(e) {
+            document.getElementById('imageInput').addEventListener('change', async function(e) {
                 const file = e.target.files[0];
-                if (file) {
-                    const reader = new FileReader();
-                    reader.onload = function(e) {
-                        uploadedImage = e.target.result;
-                        document.getElementById('previewImg').src = uploadedImage;
-                        document.getElementById('imagePreview').style.display = 'block';
-
-                        // Redraw puzzles with image
-                        if (sessionId) {
-                            fetch('/api/get_state', {
-                                method: 'POST',
-                                headers: { 'Content-Type': 'application/json' },
-                                body: JSON.stringify({ session_id: sessionId })
-                            })
-                            .then(response => response.json())
-                            .then(data => {
-                                updatePuzzleDisplay(data.state, data.moves);
-                            });
-                        }
-                    };
-                    reader.readAsDataURL(file);
+                if (!file) return;
+
+                // The server slices the image once; tiles are then fetched by URL
+                const formData = new FormData();
+                formData.append('image', file);
+                try {
+                    const response = await fetch('/api/upload_image', { method: 'POST', body: formData });
+                    if (response.status === 413) {
+                        alert('Image is too large (10MB maximum)');
+                        return;
+                    }
+                    const isJson = (response.headers.get('Content-Type') || '').includes('application/json');
+                    const data = isJson ? await response.json() : {};
+                    if (!response.ok || data.error) {
+                        alert(data.error || 'Could not upload image');
+                        return;
+                    }
+                    imageId = data.image_id;
+                    goalDrawn = false;
+                } catch (error) {
+                    console.error('Error uploading image:', error);
+                    return;
+                }
+
+                if (previewUrl) URL.revokeObjectURL(previewUrl);
+                previewUrl = URL.createObjectURL(file);
+                document.getElementById('previewImg').src = previewUrl;
+                document.getElementById('imagePreview').style.display = 'block';
+
+                // Redraw puzzles with image
+                if (sessionId) {
+                    fetch('/api/get_state', {
+                        method: 'POST',
+                        headers: { 'Content-Type': 'application/json' },
+                        body: JSON.stringify({ session_id: sessionId })
+                    })
+                    .then(response => response.json())
+                    .then(data => {
+                        updatePuzzleDisplay(data.state, data.moves);
+                    });
                 }
             });
         };
@@ -220,9 +266,22 @@ HTML_TEMPLATE = '''
         // Create new game
         async function newGame() {
             try {
-                const response = await fetch('/api/new_game', { method: 'POST' });
+                const response = await fetch('/api/new_game', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({
+                        difficulty: getDifficulty(),
+                        goal: getGoal()
+                    })
+                });
                 const data = await response.json();
+                if (data.error) {
+                    alert(data.error);
+                    return;
+                }
                 sessionId = data.session_id;
+                goalState = data.goal;
+                goalDrawn = false;
                 document.getElementById('sessionId').textContent = sessionId.substring(0, 8);
                 updatePuzzleDisplay(data.state, data.moves);
             } catch (error) {
@@ -237,9 +296,16 @@ HTML_TEMPLATE = '''
                 const response = await fetch('/api/shuffle', {
                     method: 'POST',
                     headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ session_id: sessionId })
+                    body: JSON.stringify({
+                        session_id: sessionId,
+                        difficulty: getDifficulty()
+                    })
                 });
                 const data = await response.json();
+                if (data.error) {
+                    alert(data.error);
+                    return;
+                }
                 updatePuzzleDisplay(data.state, data.moves);
                 hideSolution();
                 hideSuccess();
@@ -327,6 +393,31 @@ HTML_TEMPLATE = '''
             }
         }
 
+        // Get next move hint
+        async function showHint() {
+            if (isAnimating) return;
+            try {
+                const response = await fetch('/api/hint', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ session_id: sessionId })
+                });
+                const data = await response.json();
+                const msg = document.getElementById('hintMessage');
+
+                if (data.error) {
+                    msg.textContent = data.error;
+                } else if (data.solved) {
+                    msg.textContent = 'Already solved!';
+                } else {
+                    msg.textContent = `Hint: move tile ${data.tile} (${data.remaining} moves left)`;
+                }
+                msg.style.display = 'block';
+            } catch (error) {
+                console.error('Error getting hint:', error);
+            }
+        }
+
         // Update puzzle display
         function updatePuzzleDisplay(state, moves) {
             // Update current puzzle
@@ -340,19 +431,13 @@ HTML_TEMPLATE = '''
                 if (state[i] === 0) {
                     piece.classList.add('empty');
                 } else {
-                    if (uploadedImage) {
+                    if (imageId) {
                         // Use image for puzzle piece
                         piece.classList.add('image');
 
-                        // Calculate background position for this tile
-                        // state[i] tells us which piece number this is (1-8)
-                        // We need to show the correct part of the image
-                        const tileNumber = state[i] - 1; // Convert to 0-based
-                        const row = Math.floor(tileNumber / 3);
-                        const col = tileNumber % 3;
-
-                        piece.style.backgroundImage = `url(${uploadedImage})`;
-                        piece.style.backgroundPosition = `-${col * 100}px -${row * 100}px`;
+                        // state[i] tells us which piece number this is (1-8),
+                        // and tile state[i] - 1 is that part of the image
+                        piece.style.backgroundImage = `url(${tileUrl(state[i])})`;
 
                         // Add text overlay to show number
                         piece.innerHTML = `<div style="position: absolute; top: 2px; left: 2px; background: rgba(255,255,255,0.7); padding: 2px 5px; font-size: 14px;">${state[i]}</div>`;
@@ -370,9 +455,9 @@ HTML_TEMPLATE = '''
 
             // Update target puzzle
             const targetPuzzle = document.getElementById('targetPuzzle');
-            if (targetPuzzle.children.length === 0 || uploadedImage) {
+            if (!goalDrawn) {
+                goalDrawn = true;
                 targetPuzzle.innerHTML = '';
-                const goalState = [1, 2, 3, 4, 5, 6, 7, 8, 0];
                 for (let i = 0; i < 9; i++) {
                     const piece = document.createElement('div');
                     piece.className = 'puzzle-piece';
@@ -380,13 +465,9 @@ HTML_TEMPLATE = '''
                     if (goalState[i] === 0) {
                         piece.classList.add('empty');
                     } else {
-                        if (uploadedImage) {
+                        if (imageId) {
                             piece.classList.add('image');
-                            const tileNumber = goalState[i] - 1;
-                            const row = Math.floor(tileNumber / 3);
-                            const col = tileNumber % 3;
-                            piece.style.backgroundImage = `url(${uploadedImage})`;
-                            piece.style.backgroundPosition = `-${col * 100}px -${row * 100}px`;
+                            piece.style.backgroundImage = `url(${tileUrl(goalState[i])})`;
                             piece.innerHTML = `<div style="position: absolute; top: 2px; left: 2px; background: rgba(255,255,255,0.7); padding: 2px 5px; font-size: 14px;">${goalState[i]}</div>`;
                         } else {
                             piece.classList.add('number');
@@ -400,9 +481,9 @@ HTML_TEMPLATE = '''
 
             // Update stats
             document.getElementById('moveCount').textContent = moves;
+            document.getElementById('hintMessage').style.display = 'none';
 
             // Check if solved
-            const goalState = [1, 2, 3, 4, 5, 6, 7, 8, 0];
             const isSolved = state.every((val, idx) => val === goalState[idx]);
             document.getElementById('gameStatus').textContent = isSolved ? 'Solved!' : 'Playing';
         }
@@ -413,7 +494,7 @@ HTML_TEMPLATE = '''
             const info = document.getElementById('solutionInfo');
             const steps = document.getElementById('solutionSteps');
 
-            info.innerHTML = `Algorithm: ${data.algorithm} | Steps: ${data.steps} | Time: ${data.time.toFixed(3)}s | Nodes: ${data.nodes_explored || 'N/A'}`;
+            info.innerHTML = `Algorithm: ${data.algorithm} | Steps: ${data.steps} | Time: ${data.time.toFixed(3)}s | Nodes: ${data.nodes_explored || 'N/A'}${data.cached ? ' (cached)' : ''}${data.bound ? ` | Bound: ${data.bound.toFixed(2)}x optimal` : ''}`;
 
             steps.innerHTML = '';
             data.solution.forEach((state, index) => {
@@ -438,13 +519,25 @@ HTML_TEMPLATE = '''
             isAnimating = false;
 
             const finalState = currentSolution[currentSolution.length - 1];
-            const goalState = [1, 2, 3, 4, 5, 6, 7, 8, 0];
             if (finalState.every((val, idx) => val === goalState[idx])) {
                 showSuccess(currentSolution.length - 1);
             }
         }
 
         // Utility functions
+        function getDifficulty() {
+            return document.getElementById('difficultySelect').value || null;
+        }
+
+        function tileUrl(tile) {
+            return `/api/tiles/${imageId}/${tile - 1}`;
+        }
+
+        function getGoal() {
+            const text = document.getElementById('goalInput').value.trim();
+            return text ? text.split(/[^0-9]+/).filter(t => t !== '').map(Number) : null;
+        }
+
         function sleep(ms) {
             return new Promise(resolve => setTimeout(resolve, ms));
         }
@@ -469,224 +562,76 @@ HTML_TEMPLATE = '''
 '''
 
 
-class PuzzleState:
-    """Represents a state of the 8-puzzle"""
-
-    def __init__(self, state: List[int], parent=None, move=None, depth=0):
-        self.state = state
-        self.parent = parent
-        self.move = move
-        self.depth = depth
-        self.hash = tuple(state)
-
-    def __eq__(self, other):
-        return self.hash == other.hash
-
-    def __hash__(self):
-        return hash(self.hash)
-
-    def __lt__(self, other):
-        return False
-
-    def get_blank_position(self) -> int:
-        return self.state.index(0)
-
-    def get_neighbors(self) -> List['PuzzleState']:
-        neighbors = []
-        blank_pos = self.get_blank_position()
-        row, col = blank_pos // 3, blank_pos % 3
-
-        moves = [
-            (-1, 0, blank_pos - 3),  # up
-            (1, 0, blank_pos + 3),  # down
-            (0, -1, blank_pos - 1),  # left
-            (0, 1, blank_pos + 1)  # right
-        ]
-
-        for dr, dc, new_pos in moves:
-            new_row, new_col = row + dr, col + dc
-            if 0 <= new_row < 3 and 0 <= new_col < 3:
-                if abs((new_pos % 3) - (blank_pos % 3)) <= 1 or abs(new_pos - blank_pos) == 3:
-                    new_state = self.state.copy()
-                    new_state[blank_pos], new_state[new_pos] = new_state[new_pos], new_state[blank_pos]
-                    neighbors.append(PuzzleState(new_state, self, new_pos, self.depth + 1))
-
-        return neighbors
-
-    def is_goal(self) -> bool:
-        return self.state == [1, 2, 3, 4, 5, 6, 7, 8, 0]
-
-    def manhattan_distance(self) -> int:
-        distance = 0
-        for i in range(9):
-            if self.state[i] != 0:
-                current_row, current_col = i // 3, i % 3
-                goal_pos = self.state[i] - 1
-                goal_row, goal_col = goal_pos // 3, goal_pos % 3
-                distance += abs(current_row - goal_row) + abs(current_col - goal_col)
-        return distance
-
-    def misplaced_tiles(self) -> int:
-        goal = [1, 2, 3, 4, 5, 6, 7, 8, 0]
-        return sum(1 for i in range(9) if self.state[i] != 0 and self.state[i] != goal[i])
-
-
-class PuzzleSolver:
-    """Solver for 8-puzzle using various algorithms"""
-
-    @staticmethod
-    def reconstruct_path(final_state: PuzzleState) -> List[List[int]]:
-        path = []
-        current = final_state
-        while current:
-            path.append(current.state)
-            current = current.parent
-        return list(reversed(path))
-
-    @staticmethod
-    def astar_search(initial_state: List[int], heuristic='manhattan') -> Tuple[List[List[int]], int]:
-        start = PuzzleState(initial_state)
-        if start.is_goal():
-            return [initial_state], 0
-
-        counter = 0
-        open_set = []
-        heapq.heappush(open_set, (0, counter, start))
-        g_score = {start.hash: 0}
-        closed_set = set()
-        nodes_explored = 0
-        max_nodes = 100000
-
-        while open_set and nodes_explored < max_nodes:
-            _, _, current = heapq.heappop(open_set)
-
-            if current.hash in closed_set:
-                continue
-
-            nodes_explored += 1
-
-            if current.is_goal():
-                return PuzzleSolver.reconstruct_path(current), nodes_explored
-
-            closed_set.add(current.hash)
-
-            for neighbor in current.get_neighbors():
-                if neighbor.hash in closed_set:
-                    continue
-
-                tentative_g = g_score[current.hash] + 1
-
-                if neighbor.hash not in g_score or tentative_g < g_score[neighbor.hash]:
-                    g_score[neighbor.hash] = tentative_g
-
-                    if heuristic == 'manhattan':
-                        h = neighbor.manhattan_distance()
-                    else:
-                        h = neighbor.misplaced_tiles()
-
-                    f_score = tentative_g + h
-                    counter += 1
-                    heapq.heappush(open_set, (f_score, counter, neighbor))
-
-        return None, nodes_explored
-
-    @staticmethod
-    def bfs_search(initial_state: List[int]) -> Tuple[List[List[int]], int]:
-        start = PuzzleState(initial_state)
-        if start.is_goal():
-            return [initial_state], 0
-
-        queue = deque([start])
-        visited = {start.hash}
-        nodes_explored = 0
-        max_nodes = 100000
-
-        while queue and nodes_explored < max_nodes:
-            current = queue.popleft()
-            nodes_explored += 1
-
-            for neighbor in current.get_neighbors():
-                if neighbor.hash not in visited:
-                    if neighbor.is_goal():
-                        return PuzzleSolver.reconstruct_path(neighbor), nodes_explored
-
-                    visited.add(neighbor.hash)
-                    queue.append(neighbor)
-
-        return None, nodes_explored
-
-    @staticmethod
-    def dfs_search(initial_state: List[int], max_depth: int = 20) -> Tuple[List[List[int]], int]:
-        start = PuzzleState(initial_state)
-        if start.is_goal():
-            return [initial_state], 0
-
-        stack = [start]
-        visited = set()
-        nodes_explored = 0
-
-        while stack and nodes_explored < 10000:
-            current = stack.pop()
-
-            if current.hash in visited or current.depth > max_depth:
-                continue
-
-            visited.add(current.hash)
-            nodes_explored += 1
-
-            if current.is_goal():
-                return PuzzleSolver.reconstruct_path(current), nodes_explored
-
-            for neighbor in reversed(current.get_neighbors()):
-                if neighbor.hash not in visited:
-                    stack.append(neighbor)
-
-        return None, nodes_explored
-
-    @staticmethod
-    def greedy_search(initial_state: List[int]) -> Tuple[List[List[int]], int]:
-        start = PuzzleState(initial_state)
-        if start.is_goal():
-            return [initial_state], 0
-
-        counter = 0
-        open_set = []
-        heapq.heappush(open_set, (start.manhattan_distance(), counter, start))
-        visited = set()
-        nodes_explored = 0
-        max_nodes = 50000
-
-        while open_set and nodes_explored < max_nodes:
-            _, _, current = heapq.heappop(open_set)
-
-            if current.hash in visited:
-                continue
-
-            visited.add(current.hash)
-            nodes_explored += 1
-
-            if current.is_goal():
-                return PuzzleSolver.reconstruct_path(current), nodes_explored
-
-            for neighbor in current.get_neighbors():
-                if neighbor.hash not in visited:
-                    counter += 1
-                    heapq.heappush(open_set, (neighbor.manhattan_distance(), counter, neighbor))
+class SolutionPlan:
+    """Keeps the last solution of a session valid while the player moves.
+
+    path[0] is always the current state.  A move along the path drops its
+    head; a single move off the path is undone by prepending the new state;
+    a second move off the path discards the plan.  Only optimal solutions
+    are loaded, so `optimal` is False only while on an unverified detour."""
+
+    def __init__(self, frame: GoalFrame):
+        self.frame = frame
+        self.path = None
+        self.optimal = False
+        self.optimal_before_detour = False
+        self.detour = False
+
+    def load(self, path: List[List[int]]):
+        self.path = [state.copy() for state in path]
+        self.optimal = True
+        self.detour = False
+
+    def clear(self):
+        self.path = None
+
+    def on_move(self, state: List[int]):
+        if self.path is None:
+            return
+
+        if len(self.path) > 1 and self.path[1] == state:
+            self.path.pop(0)
+            if self.detour:
+                self.optimal = self.optimal_before_detour
+                self.detour = False
+        elif self.detour:
+            self.path = None
+        else:
+            # One move changes the optimal distance by exactly one, so the detour
+            # is optimal unless the new state could be two moves closer to the goal
+            remaining = len(self.path) - 1
+            h = PuzzleState(self.frame.to_standard(state)).manhattan_distance()
+            self.optimal_before_detour = self.optimal
+            self.optimal = self.optimal and h > remaining - 1
+            self.path.insert(0, state.copy())
+            self.detour = True
 
-        return None, nodes_explored
+    def next_state(self) -> Optional[List[int]]:
+        if self.path is None or len(self.path) < 2:
+            return None
+        return self.path[1]
 
 
 class GameSession:
     """Represents a game session"""
 
-    def __init__(self):
+    def __init__(self, goal: Optional[List[int]] = None):
         self.session_id = str(uuid.uuid4())
-        self.state = [1, 2, 3, 4, 5, 6, 7, 8, 0]
+        self.frame = GoalFrame(goal if goal is not None else [1, 2, 3, 4, 5, 6, 7, 8, 0])
+        self.goal = self.frame.goal
+        self.state = self.goal.copy()
         self.moves = 0
         self.start_time = time.time()
+        self.plan = SolutionPlan(self.frame)
 
-    def shuffle(self):
-        self.state = [1, 2, 3, 4, 5, 6, 7, 8, 0]
+    def shuffle(self, difficulty=None):
+        if difficulty is not None:
+            self.state = self.frame.from_standard(PuzzleGenerator.sample(difficulty))
+            self.moves = 0
+            self.plan.clear()
+            return
+
+        self.state = self.goal.copy()
         puzzle_state = PuzzleState(self.state)
 
         num_shuffles = random.randint(50, 100)
@@ -697,10 +642,12 @@ class GameSession:
                 self.state = puzzle_state.state.copy()
 
         self.moves = 0
+        self.plan.clear()
 
     def reset(self):
-        self.state = [1, 2, 3, 4, 5, 6, 7, 8, 0]
+        self.state = self.goal.copy()
         self.moves = 0
+        self.plan.clear()
 
     def make_move(self, position: int) -> bool:
         if position < 0 or position >= 9:
@@ -713,11 +660,87 @@ class GameSession:
         if abs(row1 - row2) + abs(col1 - col2) == 1:
             self.state[blank_pos], self.state[position] = self.state[position], self.state[blank_pos]
             self.moves += 1
+            self.plan.on_move(self.state)
             return True
         return False
 
     def is_solved(self) -> bool:
-        return self.state == [1, 2, 3, 4, 5, 6, 7, 8, 0]
+        return self.state == self.goal
+
+
+class TileCache:
+    """LRU cache of uploaded images sliced into puzzle tiles, keyed by content hash"""
+
+    TILE_SIZE = 100
+
+    def __init__(self, max_images: int = 100):
+        self.max_images = max_images
+        self.images = OrderedDict()
+        self.lock = threading.Lock()
+
+    def add(self, data: bytes) -> str:
+        image_id = hashlib.sha256(data).hexdigest()
+        with self.lock:
+            if image_id in self.images:
+                self.images.move_to_end(image_id)
+                return image_id
+
+        # Slicing is slow, so it runs outside the lock
+        tiles = self.slice(data)
+
+        with self.lock:
+            self.images[image_id] = tiles
+            self.images.move_to_end(image_id)
+            if len(self.images) > self.max_images:
+                self.images.popitem(last=False)
+        return image_id
+
+    def get(self, image_id: str, tile: int) -> Optional[bytes]:
+        with self.lock:
+            tiles = self.images.get(image_id)
+            if tiles is None or not 0 <= tile < len(tiles):
+                return None
+            self.images.move_to_end(image_id)
+            return tiles[tile]
+
+    @classmethod
+    def slice(cls, data: bytes) -> List[bytes]:
+        # Pillow is only needed once someone uploads an image
+        from PIL import Image, ImageOps
+
+        image = ImageOps.exif_transpose(Image.open(io.BytesIO(data))).convert('RGB')
+        image = image.resize((cls.TILE_SIZE * 3, cls.TILE_SIZE * 3), Image.LANCZOS)
+
+        tiles = []
+        for row in range(3):
+            for col in range(3):
+                box = (col * cls.TILE_SIZE, row * cls.TILE_SIZE,
+                       (col + 1) * cls.TILE_SIZE, (row + 1) * cls.TILE_SIZE)
+                buffer = io.BytesIO()
+                image.crop(box).save(buffer, 'JPEG', quality=85)
+                tiles.append(buffer.getvalue())
+        return tiles
+
+
+# Solutions shared across sessions, keyed by canonical board
+solution_cache = SolutionCache()
+
+# Image tiles shared across sessions, keyed by content hash
+tile_cache = TileCache()
+
+
+def number_param(data: dict, name: str, default, cast, low, high, label: str):
+    value = data.get(name, default)
+    try:
+        # JSON true/false would otherwise pass as 1 and 0
+        number = None if isinstance(value, bool) else cast(value)
+    except (TypeError, ValueError):
+        number = None
+
+    if number is None or not math.isfinite(number) or not low <= number <= high:
+        kind = 'a whole number' if cast is int else 'a number'
+        raise ValueError(f'{label} must be {kind} between {low} and {high}')
+    return number
 
 
 # Routes
@@ -728,13 +751,20 @@ def index():
 
 @app.route('/api/new_game', methods=['POST'])
 def new_game():
-    session = GameSession()
-    session.shuffle()
+    data = request.get_json(silent=True) or {}
+
+    try:
+        session = GameSession(data.get('goal'))
+        session.shuffle(data.get('difficulty'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
     game_sessions[session.session_id] = session
 
     return jsonify({
         'session_id': session.session_id,
         'state': session.state,
+        'goal': session.goal,
         'moves': session.moves
     })
 
@@ -750,6 +780,7 @@ def get_state():
     session = game_sessions[session_id]
     return jsonify({
         'state': session.state,
+        'goal': session.goal,
         'moves': session.moves,
         'solved': session.is_solved()
     })
@@ -764,10 +795,14 @@ def shuffle():
         return jsonify({'error': 'Invalid session'}), 400
 
     session = game_sessions[session_id]
-    session.shuffle()
+    try:
+        session.shuffle(data.get('difficulty'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
     return jsonify({
         'state': session.state,
+        'goal': session.goal,
         'moves': session.moves
     })
 
@@ -785,6 +820,7 @@ def reset():
 
     return jsonify({
         'state': session.state,
+        'goal': session.goal,
         'moves': session.moves
     })
 
@@ -825,35 +861,87 @@ def solve():
     start_time = time.time()
 
     try:
-        if algorithm == 'astar_manhattan':
-            solution, nodes = PuzzleSolver.astar_search(session.state, 'manhattan')
-            algorithm_name = 'A* (Manhattan Distance)'
-        elif algorithm == 'astar_misplaced':
-            solution, nodes = PuzzleSolver.astar_search(session.state, 'misplaced')
-            algorithm_name = 'A* (Misplaced Tiles)'
-        elif algorithm == 'bfs':
-            solution, nodes = PuzzleSolver.bfs_search(session.state)
-            algorithm_name = 'Breadth-First Search'
-        elif algorithm == 'dfs':
-            solution, nodes = PuzzleSolver.dfs_search(session.state)
-            algorithm_name = 'Depth-First Search (Limited)'
-        elif algorithm == 'greedy':
-            solution, nodes = PuzzleSolver.greedy_search(session.state)
-            algorithm_name = 'Greedy Best-First Search'
+        frame = GoalFrame(data['goal']) if data.get('goal') is not None else session.frame
+
+        # Options are only read, and only checked, for the algorithm that uses them
+        if algorithm == 'anytime':
+            weight = number_param(data, 'weight', 2.5, float, 1, 10, 'Weight')
+            time_limit = number_param(data, 'time_limit', 1.0, float, 0.01, 30, 'Time limit (seconds)')
+        elif algorithm == 'beam':
+            beam_width = number_param(data, 'beam_width', 100, int, 1, 10000, 'Beam width')
+            heuristic = data.get('heuristic', 'manhattan')
+            if heuristic not in ('manhattan', 'misplaced'):
+                raise ValueError('Heuristic must be "manhattan" or "misplaced"')
+        elif algorithm == 'portfolio':
+            optimal = data.get('optimal', True)
+            if not isinstance(optimal, bool):
+                raise ValueError('Optimal must be true or false')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    board = frame.to_standard(session.state)
+    if not PuzzleSolver.is_solvable(board):
+        return jsonify({
+            'success': False,
+            'message': 'This goal cannot be reached from the current state'
+        })
+
+    try:
+        bound = None
+        cached = False
+        winner = None
+
+        if algorithm == 'portfolio':
+            # Bypasses the solution cache so every answer records which solver won
+            solution, nodes, winner = PortfolioSolver.solve(board, optimal)
+            algorithm_name = f'Portfolio (won by {winner})' if winner else 'Portfolio'
+        elif algorithm == 'anytime':
+            # Results depend on the time budget, so they bypass the solution cache
+            solution, nodes, bound = PuzzleSolver.anytime_astar_search(board, weight, time_limit=time_limit)
+            algorithm_name = 'Anytime Weighted A*'
         else:
-            solution, nodes = PuzzleSolver.astar_search(session.state, 'manhattan')
-            algorithm_name = 'A* (Manhattan Distance)'
+            if algorithm == 'astar_misplaced':
+                search = lambda state: PuzzleSolver.astar_search(state, 'misplaced')
+                algorithm_name = 'A* (Misplaced Tiles)'
+            elif algorithm == 'bfs':
+                search = PuzzleSolver.bfs_search
+                algorithm_name = 'Breadth-First Search'
+            elif algorithm == 'dfs':
+                search = PuzzleSolver.dfs_search
+                algorithm_name = 'Depth-First Search (Limited)'
+            elif algorithm == 'greedy':
+                search = PuzzleSolver.greedy_search
+                algorithm_name = 'Greedy Best-First Search'
+            elif algorithm == 'beam':
+                algorithm = f'beam:{beam_width}:{heuristic}'
+                search = lambda state: PuzzleSolver.beam_search(state, beam_width, heuristic)
+                algorithm_name = f'Beam Search (Width {beam_width}, {heuristic.capitalize()})'
+            else:
+                algorithm = 'astar_manhattan'
+                search = lambda state: PuzzleSolver.astar_search(state, 'manhattan')
+                algorithm_name = 'A* (Manhattan Distance)'
+
+            solution, nodes, cached = solution_cache.solve(algorithm, board, search)
 
         solve_time = time.time() - start_time
 
+        # Hints promise the best next move, so only proven-optimal solutions replace the plan
+        optimal_result = (algorithm in ('astar_manhattan', 'astar_misplaced', 'bfs')
+                          or (algorithm == 'portfolio' and optimal) or bound == 1.0)
+        if solution and frame is session.frame and optimal_result:
+            session.plan.load(frame.restore_path(solution))
+
         if solution:
             return jsonify({
                 'success': True,
-                'solution': solution,
+                'solution': frame.restore_path(solution),
                 'steps': len(solution) - 1,
                 'time': solve_time,
                 'algorithm': algorithm_name,
-                'nodes_explored': nodes
+                'nodes_explored': nodes,
+                'cached': cached,
+                'bound': bound,
+                'winner': winner
             })
         else:
             return jsonify({
@@ -869,6 +957,87 @@ def solve():
         }), 500
 
 
+@app.route('/api/hint', methods=['POST'])
+def hint():
+    data = request.json
+    session_id = data.get('session_id')
+
+    if session_id not in game_sessions:
+        return jsonify({'error': 'Invalid session'}), 400
+
+    session = game_sessions[session_id]
+    if session.is_solved():
+        return jsonify({'solved': True})
+
+    # A detour that could not be proved optimal may lie on another optimal path,
+    # so search again rather than suggest undoing the player's move
+    if session.plan.next_state() is None or not session.plan.optimal:
+        board = session.frame.to_standard(session.state)
+        if not PuzzleSolver.is_solvable(board):
+            return jsonify({'error': 'This goal cannot be reached from the current state'}), 400
+
+        solution, _, _ = solution_cache.solve(
+            'astar_manhattan', board, lambda state: PuzzleSolver.astar_search(state, 'manhattan'))
+        if not solution:
+            return jsonify({'error': 'No solution found within search limits'}), 400
+        session.plan.load(session.frame.restore_path(solution))
+
+    next_state = session.plan.next_state()
+    position = next_state.index(0)
+
+    return jsonify({
+        'solved': False,
+        'position': position,
+        'tile': session.state[position],
+        'state': next_state,
+        'remaining': len(session.plan.path) - 1,
+        'optimal': session.plan.optimal
+    })
+
+
+@app.route('/api/upload_image', methods=['POST'])
+def upload_image():
+    file = request.files.get('image')
+    if file is None:
+        return jsonify({'error': 'Image required'}), 400
+
+    try:
+        image_id = tile_cache.add(file.read())
+    except ImportError:
+        return jsonify({'error': 'Image upload requires Pillow on the server'}), 501
+    except Exception as e:
+        print(f"Error in upload_image endpoint: {str(e)}")
+        return jsonify({'error': 'Could not read image'}), 400
+
+    return jsonify({
+        'image_id': image_id,
+        'tiles': [f'/api/tiles/{image_id}/{tile}' for tile in range(9)]
+    })
+
+
+@app.route('/api/tiles/<image_id>/<int:tile>', methods=['GET'])
+def get_tile(image_id, tile):
+    data = tile_cache.get(image_id, tile)
+    if data is None:
+        return jsonify({'error': 'Unknown tile'}), 404
+
+    # Tiles are addressed by content, so they never change
+    etag = f'{image_id}-{tile}'
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(data, mimetype='image/jpeg')
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+
+@app.route('/api/portfolio_stats', methods=['GET'])
+def portfolio_stats():
+    return jsonify({'wins': PortfolioSolver.win_counts()})
+
+
 def cleanup_old_sessions():
     current_time = time.time()
     to_remove = []
@@ -879,13 +1048,17 @@ def cleanup_old_sessions():
         del game_sessions[sid]
 
 
-if __name__ == '__main__':
+def run_server(host: str = '0.0.0.0', port: int = 5050):
     print("=" * 50)
     print("8-PUZZLE GAME")
     print("=" * 50)
     print("Starting server...")
-    print("Open http://localhost:5000 in your browser to play!")
+    print(f"Open http://localhost:{port} in your browser to play!")
     print("Press Ctrl+C to stop the server")
     print("=" * 50)
 
-    app.run(debug=False, port=5050, host='0.0.0.0')
\ No newline at end of file
+    app.run(debug=False, port=port, host=host)
+
+
+if __name__ == '__main__':
+    run_server()
\ No newline at end of file
@@ -0,0 +1,672 @@
+# 8-Puzzle Solver
+# ====================================================================
+#
+# Search algorithms and puzzle generation without any web dependencies.
+# Importable as a library, or run as a command line tool:
+#
+#   python puzzle_solver.py boards.txt --algorithm astar_manhattan
+#   echo "1 2 3 4 5 6 0 7 8" | python puzzle_solver.py
+#   python puzzle_solver.py --serve
+
+import argparse
+import random
+import re
+import sys
+import threading
+import time
+import heapq
+from collections import deque, OrderedDict, Counter
+from typing import Dict, List, Tuple, Optional
+
+from puzzle_symmetry import GoalFrame, canonicalize, is_self_symmetric, reflect, restore_path
+
+
+class PuzzleState:
+    """Represents a state of the 8-puzzle"""
+
+    def __init__(self, state: List[int], parent=None, move=None, depth=0):
+        self.state = state
+        self.parent = parent
+        self.move = move
+        self.depth = depth
+        self.hash = tuple(state)
+
+    def __eq__(self, other):
+        return self.hash == other.hash
+
+    def __hash__(self):
+        return hash(self.hash)
+
+    def __lt__(self, other):
+        return False
+
+    def get_blank_position(self) -> int:
+        return self.state.index(0)
+
+    def get_neighbors(self) -> List['PuzzleState']:
+        neighbors = []
+        blank_pos = self.get_blank_position()
+        row, col = blank_pos // 3, blank_pos % 3
+
+        moves = [
+            (-1, 0, blank_pos - 3),  # up
+            (1, 0, blank_pos + 3),  # down
+            (0, -1, blank_pos - 1),  # left
+            (0, 1, blank_pos + 1)  # right
+        ]
+
+        for dr, dc, new_pos in moves:
+            new_row, new_col = row + dr, col + dc
+            if 0 <= new_row < 3 and 0 <= new_col < 3:
+                if abs((new_pos % 3) - (blank_pos % 3)) <= 1 or abs(new_pos - blank_pos) == 3:
+                    new_state = self.state.copy()
+                    new_state[blank_pos], new_state[new_pos] = new_state[new_pos], new_state[blank_pos]
+                    neighbors.append(PuzzleState(new_state, self, new_pos, self.depth + 1))
+
+        return neighbors
+
+    def is_goal(self) -> bool:
+        return self.state == [1, 2, 3, 4, 5, 6, 7, 8, 0]
+
+    def manhattan_distance(self) -> int:
+        distance = 0
+        for i in range(9):
+            if self.state[i] != 0:
+                current_row, current_col = i // 3, i % 3
+                goal_pos = self.state[i] - 1
+                goal_row, goal_col = goal_pos // 3, goal_pos % 3
+                distance += abs(current_row - goal_row) + abs(current_col - goal_col)
+        return distance
+
+    def misplaced_tiles(self) -> int:
+        goal = [1, 2, 3, 4, 5, 6, 7, 8, 0]
+        return sum(1 for i in range(9) if self.state[i] != 0 and self.state[i] != goal[i])
+
+
+class PuzzleSolver:
+    """Solver for 8-puzzle using various algorithms"""
+
+    @staticmethod
+    def is_solvable(state: List[int]) -> bool:
+        tiles = [tile for tile in state if tile != 0]
+        inversions = sum(1 for i in range(len(tiles)) for j in range(i + 1, len(tiles)) if tiles[i] > tiles[j])
+        return inversions % 2 == 0
+
+    @staticmethod
+    def reconstruct_path(final_state: PuzzleState) -> List[List[int]]:
+        path = []
+        current = final_state
+        while current:
+            path.append(current.state)
+            current = current.parent
+        return list(reversed(path))
+
+    @staticmethod
+    def astar_search(initial_state: List[int], heuristic='manhattan') -> Tuple[List[List[int]], int]:
+        start = PuzzleState(initial_state)
+        if start.is_goal():
+            return [initial_state], 0
+
+        counter = 0
+        open_set = []
+        heapq.heappush(open_set, (0, counter, start))
+        g_score = {start.hash: 0}
+        closed_set = set()
+        nodes_explored = 0
+        max_nodes = 100000
+
+        while open_set and nodes_explored < max_nodes:
+            _, _, current = heapq.heappop(open_set)
+
+            if current.hash in closed_set:
+                continue
+
+            nodes_explored += 1
+
+            if current.is_goal():
+                return PuzzleSolver.reconstruct_path(current), nodes_explored
+
+            closed_set.add(current.hash)
+
+            for neighbor in current.get_neighbors():
+                if neighbor.hash in closed_set:
+                    continue
+
+                tentative_g = g_score[current.hash] + 1
+
+                if neighbor.hash not in g_score or tentative_g < g_score[neighbor.hash]:
+                    g_score[neighbor.hash] = tentative_g
+
+                    if heuristic == 'manhattan':
+                        h = neighbor.manhattan_distance()
+                    else:
+                        h = neighbor.misplaced_tiles()
+
+                    f_score = tentative_g + h
+                    counter += 1
+                    heapq.heappush(open_set, (f_score, counter, neighbor))
+
+        return None, nodes_explored
+
+    @staticmethod
+    def weighted_astar_search(start: PuzzleState, weight: float, cost_limit: float = float('inf'),
+                              deadline: float = float('inf'), max_nodes: int = 100000) -> Tuple[Optional[PuzzleState], int, bool]:
+        """Weighted A* on f = g + weight * h that ignores nodes with g + h >= cost_limit.
+        Returns (goal node or None, nodes explored, whether the search ran to completion)."""
+        counter = 0
+        open_set = []
+        heapq.heappush(open_set, (weight * start.manhattan_distance(), counter, start))
+        g_score = {start.hash: 0}
+        closed_set = set()
+        nodes_explored = 0
+
+        while open_set:
+            if nodes_explored >= max_nodes or time.time() >= deadline:
+                return None, nodes_explored, False
+
+            _, _, current = heapq.heappop(open_set)
+
+            if current.hash in closed_set:
+                continue
+
+            nodes_explored += 1
+
+            if current.is_goal():
+                return current, nodes_explored, True
+
+            closed_set.add(current.hash)
+
+            for neighbor in current.get_neighbors():
+                if neighbor.hash in closed_set:
+                    continue
+
+                tentative_g = g_score[current.hash] + 1
+
+                if neighbor.hash not in g_score or tentative_g < g_score[neighbor.hash]:
+                    h = neighbor.manhattan_distance()
+                    if tentative_g + h >= cost_limit:
+                        continue
+
+                    g_score[neighbor.hash] = tentative_g
+                    counter += 1
+                    heapq.heappush(open_set, (tentative_g + weight * h, counter, neighbor))
+
+        return None, nodes_explored, True
+
+    @staticmethod
+    def anytime_astar_search(initial_state: List[int], weight: float = 2.5, weight_step: float = 0.5,
+                             time_limit: float = 1.0, max_nodes: int = 100000) -> Tuple[Optional[List[List[int]]], int, Optional[float]]:
+        """Restarting weighted A*: solve quickly with a large weight, then re-solve with
+        smaller weights while pruning anything that cannot beat the best path so far.
+        Returns (best path, nodes explored, proven bound on path length / optimal length)."""
+        start = PuzzleState(initial_state)
+        if start.is_goal():
+            return [initial_state], 0, 1.0
+
+        deadline = time.time() + time_limit
+        best_path = None
+        bound = None
+        nodes_explored = 0
+
+        while True:
+            cost_limit = len(best_path) - 1 if best_path else float('inf')
+            goal, nodes, complete = PuzzleSolver.weighted_astar_search(
+                start, weight, cost_limit, deadline, max_nodes - nodes_explored)
+            nodes_explored += nodes
+
+            if not complete:
+                break
+
+            if goal:
+                best_path = PuzzleSolver.reconstruct_path(goal)
+            elif not best_path:
+                return None, nodes_explored, None
+
+            # A completed weighted search leaves the best path within a factor of weight
+            bound = weight if bound is None else min(bound, weight)
+            if weight <= 1.0:
+                break
+            weight = max(1.0, weight - weight_step)
+
+        if best_path:
+            # The heuristic never overestimates, so it also gives a lower bound on the optimum
+            bound = min(bound, (len(best_path) - 1) / start.manhattan_distance())
+
+        return best_path, nodes_explored, bound
+
+    @staticmethod
+    def bfs_search(initial_state: List[int]) -> Tuple[List[List[int]], int]:
+        start = PuzzleState(initial_state)
+        if start.is_goal():
+            return [initial_state], 0
+
+        queue = deque([start])
+        visited = {start.hash}
+        nodes_explored = 0
+        max_nodes = 100000
+
+        while queue and nodes_explored < max_nodes:
+            current = queue.popleft()
+            nodes_explored += 1
+
+            for neighbor in current.get_neighbors():
+                if neighbor.hash not in visited:
+                    if neighbor.is_goal():
+                        return PuzzleSolver.reconstruct_path(neighbor), nodes_explored
+
+                    visited.add(neighbor.hash)
+                    queue.append(neighbor)
+
+        return None, nodes_explored
+
+    @staticmethod
+    def dfs_search(initial_state: List[int], max_depth: int = 20) -> Tuple[List[List[int]], int]:
+        start = PuzzleState(initial_state)
+        if start.is_goal():
+            return [initial_state], 0
+
+        stack = [start]
+        visited = set()
+        nodes_explored = 0
+
+        while stack and nodes_explored < 10000:
+            current = stack.pop()
+
+            if current.hash in visited or current.depth > max_depth:
+                continue
+
+            visited.add(current.hash)
+            nodes_explored += 1
+
+            if current.is_goal():
+                return PuzzleSolver.reconstruct_path(current), nodes_explored
+
+            for neighbor in reversed(current.get_neighbors()):
+                if neighbor.hash not in visited:
+                    stack.append(neighbor)
+
+        return None, nodes_explored
+
+    @staticmethod
+    def greedy_search(initial_state: List[int]) -> Tuple[List[List[int]], int]:
+        start = PuzzleState(initial_state)
+        if start.is_goal():
+            return [initial_state], 0
+
+        counter = 0
+        open_set = []
+        heapq.heappush(open_set, (start.manhattan_distance(), counter, start))
+        visited = set()
+        nodes_explored = 0
+        max_nodes = 50000
+
+        while open_set and nodes_explored < max_nodes:
+            _, _, current = heapq.heappop(open_set)
+
+            if current.hash in visited:
+                continue
+
+            visited.add(current.hash)
+            nodes_explored += 1
+
+            if current.is_goal():
+                return PuzzleSolver.reconstruct_path(current), nodes_explored
+
+            for neighbor in current.get_neighbors():
+                if neighbor.hash not in visited:
+                    counter += 1
+                    heapq.heappush(open_set, (neighbor.manhattan_distance(), counter, neighbor))
+
+        return None, nodes_explored
+
+    @staticmethod
+    def beam_search(initial_state: List[int], width: int = 100, heuristic='manhattan',
+                    max_depth: int = 200) -> Tuple[List[List[int]], int]:
+        """Breadth-first by depth, keeping only the `width` best states of each level,
+        so memory and time stay within width * max_depth states."""
+        start = PuzzleState(initial_state)
+        if start.is_goal():
+            return [initial_state], 0
+
+        beam = [start]
+        visited = {start.hash}
+        nodes_explored = 0
+
+        for _ in range(max_depth):
+            candidates = {}
+
+            for current in beam:
+                nodes_explored += 1
+
+                for neighbor in current.get_neighbors():
+                    if neighbor.hash in visited or neighbor.hash in candidates:
+                        continue
+
+                    if neighbor.is_goal():
+                        return PuzzleSolver.reconstruct_path(neighbor), nodes_explored
+
+                    if heuristic == 'manhattan':
+                        h = neighbor.manhattan_distance()
+                    else:
+                        h = neighbor.misplaced_tiles()
+
+                    candidates[neighbor.hash] = (h, len(candidates), neighbor)
+
+            if not candidates:
+                break
+
+            beam = [neighbor for _, _, neighbor in heapq.nsmallest(width, candidates.values())]
+            visited.update(neighbor.hash for neighbor in beam)
+
+        return None, nodes_explored
+
+
+# Limits how many portfolio races (each several processes) run at once
+_portfolio_slots = threading.BoundedSemaphore(2)
+
+
+def _portfolio_worker(algorithm: str, state: List[int], connection):
+    path, nodes = PortfolioSolver.SOLVERS[algorithm](state)
+    connection.send((path, nodes))
+    connection.close()
+
+
+class PortfolioSolver:
+    """Races several solvers in worker processes and keeps the first acceptable answer"""
+
+    SOLVERS = {
+        'astar_manhattan': lambda state: PuzzleSolver.astar_search(state, 'manhattan'),
+        'astar_misplaced': lambda state: PuzzleSolver.astar_search(state, 'misplaced'),
+        'bfs': PuzzleSolver.bfs_search,
+        'greedy': PuzzleSolver.greedy_search,
+        'beam': PuzzleSolver.beam_search
+    }
+
+    OPTIMAL_SOLVERS = ['astar_manhattan', 'astar_misplaced', 'bfs']
+    FAST_SOLVERS = ['greedy', 'beam']
+
+    # How often each solver produced the returned answer
+    wins = Counter()
+    wins_lock = threading.Lock()
+
+    @classmethod
+    def win_counts(cls) -> Dict[str, int]:
+        with cls.wins_lock:
+            return dict(cls.wins)
+
+    @classmethod
+    def solve(cls, initial_state: List[int], optimal: bool = True,
+              timeout: float = 10.0) -> Tuple[Optional[List[List[int]]], int, Optional[str]]:
+        with _portfolio_slots:
+            return cls._race(initial_state, optimal, timeout)
+
+    @classmethod
+    def _race(cls, initial_state: List[int], optimal: bool,
+              timeout: float) -> Tuple[Optional[List[List[int]]], int, Optional[str]]:
+        # Imported here so library and CLI users that never race solvers start faster
+        import multiprocessing
+        from multiprocessing.connection import wait
+
+        algorithms = cls.OPTIMAL_SOLVERS if optimal else cls.OPTIMAL_SOLVERS + cls.FAST_SOLVERS
+
+        # One pipe per worker: the read end reports its result, or EOF if it died first
+        pending = {}
+        workers = []
+        for algorithm in algorithms:
+            reader, writer = multiprocessing.Pipe(duplex=False)
+            worker = multiprocessing.Process(target=_portfolio_worker, args=(algorithm, initial_state, writer), daemon=True)
+            worker.start()
+            writer.close()
+            pending[reader] = (algorithm, worker)
+            workers.append(worker)
+
+        deadline = time.time() + timeout
+        try:
+            while pending:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+
+                handles = list(pending) + [worker.sentinel for _, worker in pending.values()]
+                ready = set(wait(handles, timeout=remaining))
+
+                for reader, (algorithm, worker) in list(pending.items()):
+                    if reader not in ready and worker.sentinel not in ready:
+                        continue
+
+                    try:
+                        path, nodes = reader.recv() if reader.poll() else (None, 0)
+                    except EOFError:
+                        path, nodes = None, 0
+                    del pending[reader]
+                    reader.close()
+
+                    if path is not None:
+                        with cls.wins_lock:
+                            cls.wins[algorithm] += 1
+                        return path, nodes, algorithm
+
+            return None, 0, None
+        finally:
+            for reader in pending:
+                reader.close()
+            for worker in workers:
+                if worker.is_alive():
+                    worker.terminate()
+                worker.join()
+
+
+class PuzzleGenerator:
+    """Samples solvable states uniformly at an exact optimal distance from the goal"""
+
+    DIFFICULTY_LEVELS = {
+        'easy': (1, 10),
+        'medium': (11, 20),
+        'hard': (21, 31)
+    }
+
+    # Board positions reachable from each blank position in one move
+    ADJACENT = [[1, 3], [0, 2, 4], [1, 5],
+                [0, 4, 6], [1, 3, 5, 7], [2, 4, 8],
+                [3, 7], [4, 6, 8], [5, 7]]
+
+    # Canonical representatives of all solvable states (see puzzle_symmetry),
+    # packed 9 bytes each and ordered by depth; _offsets[d] is the index of
+    # the first state at depth d
+    _states = None
+    _offsets = None
+
+    @classmethod
+    def _build(cls):
+        goal = bytes(canonicalize([1, 2, 3, 4, 5, 6, 7, 8, 0])[0])
+        seen = {goal}
+        layer = [goal]
+        packed = bytearray()
+        offsets = [0]
+
+        while layer:
+            packed.extend(b''.join(layer))
+            offsets.append(offsets[-1] + len(layer))
+
+            next_layer = []
+            for state in layer:
+                blank_pos = state.index(0)
+                for new_pos in cls.ADJACENT[blank_pos]:
+                    new_state = bytearray(state)
+                    new_state[blank_pos], new_state[new_pos] = new_state[new_pos], 0
+                    new_state = bytes(canonicalize(new_state)[0])
+                    if new_state not in seen:
+                        seen.add(new_state)
+                        next_layer.append(new_state)
+            layer = next_layer
+
+        cls._states = bytes(packed)
+        cls._offsets = offsets
+
+    @classmethod
+    def max_depth(cls) -> int:
+        if cls._offsets is None:
+            cls._build()
+        return len(cls._offsets) - 2
+
+    @classmethod
+    def depth_range(cls, difficulty) -> Tuple[int, int]:
+        if isinstance(difficulty, str) and difficulty in cls.DIFFICULTY_LEVELS:
+            return cls.DIFFICULTY_LEVELS[difficulty]
+
+        try:
+            depth = int(difficulty)
+        except (TypeError, ValueError):
+            raise ValueError(f'Unknown difficulty: {difficulty}')
+
+        if isinstance(difficulty, bool) or not 0 <= depth <= cls.max_depth():
+            raise ValueError(f'Difficulty must be between 0 and {cls.max_depth()}')
+        return depth, depth
+
+    @classmethod
+    def sample(cls, difficulty) -> List[int]:
+        low, high = cls.depth_range(difficulty)
+        if cls._offsets is None:
+            cls._build()
+
+        # Mirror pairs are stored once and self-symmetric states are kept
+        # with probability 1/2, which keeps the sample uniform over boards
+        while True:
+            index = random.randrange(cls._offsets[low], cls._offsets[high + 1])
+            state = list(cls._states[index * 9:(index + 1) * 9])
+            if is_self_symmetric(state):
+                if random.random() < 0.5:
+                    return state
+            elif random.random() < 0.5:
+                return reflect(state)
+            else:
+                return state
+
+
+class SolutionCache:
+    """LRU cache of solutions keyed by algorithm and canonical board.
+    Safe to share between request threads; searches run outside the lock."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, algorithm: str, board: List[int]) -> Optional[Tuple[List[List[int]], int]]:
+        key, transform = canonicalize(board)
+        with self.lock:
+            entry = self.entries.get((algorithm, key))
+            if entry is None:
+                return None
+            self.entries.move_to_end((algorithm, key))
+
+        path, nodes = entry
+        return restore_path(path, transform), nodes
+
+    def solve(self, algorithm: str, board: List[int], search) -> Tuple[Optional[List[List[int]]], int, bool]:
+        """Return (solution, nodes_explored, cached), running search(board)
+        on the canonical board when there is no cached entry"""
+        cached = self.get(algorithm, board)
+        if cached is not None:
+            return cached[0], cached[1], True
+
+        key, transform = canonicalize(board)
+        path, nodes = search(list(key))
+        if path is None:
+            return None, nodes, False
+
+        with self.lock:
+            self.entries[(algorithm, key)] = ([tuple(state) for state in path], nodes)
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return restore_path(path, transform), nodes, False
+
+
+ALGORITHMS = ['astar_manhattan', 'astar_misplaced', 'bfs', 'dfs', 'greedy', 'beam', 'anytime', 'portfolio']
+
+# Direction the blank moves, keyed by the change in its position
+MOVE_NAMES = {-3: 'U', 3: 'D', -1: 'L', 1: 'R'}
+
+
+def run_algorithm(algorithm: str, board: List[int]) -> Tuple[Optional[List[List[int]]], int]:
+    if algorithm == 'anytime':
+        path, nodes, _ = PuzzleSolver.anytime_astar_search(board)
+    elif algorithm == 'portfolio':
+        path, nodes, _ = PortfolioSolver.solve(board)
+    elif algorithm == 'dfs':
+        path, nodes = PuzzleSolver.dfs_search(board)
+    else:
+        path, nodes = PortfolioSolver.SOLVERS[algorithm](board)
+    return path, nodes
+
+
+def parse_board(line: str) -> List[int]:
+    tokens = re.findall(r'\d+', line)
+    if len(tokens) == 1:
+        tokens = list(tokens[0])
+
+    board = [int(token) for token in tokens]
+    if sorted(board) != list(range(9)):
+        raise ValueError(f'Not a board: {line.strip()}')
+    return board
+
+
+def format_moves(path: List[List[int]]) -> str:
+    return ''.join(MOVE_NAMES[b.index(0) - a.index(0)] for a, b in zip(path, path[1:]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Solve 8-puzzle boards, one per line. Prints "<steps> <blank moves>" per board, '
+                    'or "unsolvable", "none" (search limits reached) or "invalid".')
+    parser.add_argument('input', nargs='?', type=argparse.FileType('r'), default='-',
+                        help='file of boards (default: stdin)')
+    parser.add_argument('--algorithm', choices=ALGORITHMS, default='astar_manhattan')
+    parser.add_argument('--goal', help='goal board, e.g. 0,1,2,3,4,5,6,7,8')
+    parser.add_argument('--serve', action='store_true', help='run the web game instead')
+    parser.add_argument('--host', default='0.0.0.0', help='server mode only (default: 0.0.0.0)')
+    parser.add_argument('--port', type=int, default=5050, help='server mode only (default: 5050)')
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        # Flask is only needed, and only imported, in server mode
+        from puzzle_game import run_server
+        run_server(args.host, args.port)
+        return
+
+    try:
+        frame = GoalFrame(parse_board(args.goal) if args.goal else [1, 2, 3, 4, 5, 6, 7, 8, 0])
+    except ValueError as e:
+        parser.error(str(e))
+
+    stream = args.input
+    try:
+        for line in stream:
+            if not line.strip() or line.startswith('#'):
+                continue
+
+            try:
+                board = parse_board(line)
+            except ValueError as e:
+                print(e, file=sys.stderr)
+                print('invalid', flush=True)
+                continue
+
+            standard = frame.to_standard(board)
+            if not PuzzleSolver.is_solvable(standard):
+                print('unsolvable', flush=True)
+                continue
+
+            path, _ = run_algorithm(args.algorithm, standard)
+            if path is None:
+                print('none', flush=True)
+            else:
+                # Flushed per board so downstream readers see results as they stream
+                print(f'{len(path) - 1} {format_moves(frame.restore_path(path))}'.rstrip(), flush=True)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+# Board Symmetry for the 8-Puzzle
+# ====================================================================
+#
+# Reflecting a board about its main diagonal and relabeling the tiles
+# the same way maps the goal [1, 2, 3, 4, 5, 6, 7, 8, 0] onto itself and
+# every legal move onto a legal move.  A board and its mirror image
+# therefore have the same optimal distance and mirrored solutions, so
+# caches and tables only need to store one of the two.
+#
+# The same idea, with row/column flips and a free relabeling, turns a
+# search toward a custom goal into a search toward the standard goal.
+
+from typing import List, Sequence, Tuple
+
+IDENTITY = 0
+REFLECT = 1
+
+# REFLECT_POSITIONS[i] is where the tile at position i lands after reflection
+REFLECT_POSITIONS = [0, 3, 6, 1, 4, 7, 2, 5, 8]
+
+# REFLECT_TILES[t] is the new label of tile t after reflection
+REFLECT_TILES = [0, 1, 4, 7, 2, 5, 8, 3, 6]
+
+
+def reflect(board: Sequence[int]) -> List[int]:
+    reflected = [0] * 9
+    for i in range(9):
+        reflected[REFLECT_POSITIONS[i]] = REFLECT_TILES[board[i]]
+    return reflected
+
+
+def apply_transform(board: Sequence[int], transform: int) -> List[int]:
+    if transform == REFLECT:
+        return reflect(board)
+    return list(board)
+
+
+def canonicalize(board: Sequence[int]) -> Tuple[Tuple[int, ...], int]:
+    """Return the canonical representative of a board and the transform
+    that maps the board onto it"""
+    board = tuple(board)
+    reflected = tuple(reflect(board))
+    if reflected < board:
+        return reflected, REFLECT
+    return board, IDENTITY
+
+
+def is_self_symmetric(board: Sequence[int]) -> bool:
+    return reflect(board) == list(board)
+
+
+def restore_path(path: List[Sequence[int]], transform: int) -> List[List[int]]:
+    """Map a solution of the canonical board back to the original board.
+    Every transform is its own inverse."""
+    return [apply_transform(state, transform) for state in path]
+
+
+STANDARD_GOAL = [1, 2, 3, 4, 5, 6, 7, 8, 0]
+
+# Row/column flips that move a corner blank to the bottom-right corner;
+# FLIPS[p][i] is where the tile at position i lands when the goal blank is at p
+FLIPS = {
+    8: [0, 1, 2, 3, 4, 5, 6, 7, 8],
+    6: [2, 1, 0, 5, 4, 3, 8, 7, 6],
+    2: [6, 7, 8, 3, 4, 5, 0, 1, 2],
+    0: [8, 7, 6, 5, 4, 3, 2, 1, 0]
+}
+
+
+class GoalFrame:
+    """Translates boards aimed at a custom goal into boards aimed at the
+    standard goal, so searches, heuristics and caches work unchanged.
+
+    The board is flipped so the goal blank sits in the bottom-right corner
+    and the tiles are relabeled so the flipped goal reads 1..8.  Flips and
+    relabeling preserve moves, so optimal distances are preserved too."""
+
+    def __init__(self, goal: Sequence[int]):
+        try:
+            goal = [int(tile) for tile in goal]
+        except (TypeError, ValueError):
+            raise ValueError('Goal must be a list of 9 tiles')
+        if sorted(goal) != list(range(9)):
+            raise ValueError('Goal must contain each of 0-8 exactly once')
+        if goal.index(0) not in FLIPS:
+            raise ValueError('Goal must have the empty space in a corner')
+
+        self.goal = goal
+        self.positions = FLIPS[goal.index(0)]
+
+        flipped = [0] * 9
+        for i in range(9):
+            flipped[self.positions[i]] = goal[i]
+
+        self.tiles = [0] * 9
+        self.inverse_tiles = [0] * 9
+        for i in range(9):
+            self.tiles[flipped[i]] = STANDARD_GOAL[i]
+            self.inverse_tiles[STANDARD_GOAL[i]] = flipped[i]
+
+    def to_standard(self, board: Sequence[int]) -> List[int]:
+        translated = [0] * 9
+        for i in range(9):
+            translated[self.positions[i]] = self.tiles[board[i]]
+        return translated
+
+    def from_standard(self, board: Sequence[int]) -> List[int]:
+        # Every flip is its own inverse, so only the labels need inverting
+        translated = [0] * 9
+        for i in range(9):
+            translated[self.positions[i]] = self.inverse_tiles[board[i]]
+        return translated
+
+    def restore_path(self, path: List[Sequence[int]]) -> List[List[int]]:
+        return [self.from_standard(state) for state in path]